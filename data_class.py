@@ -1,10 +1,79 @@
 import pickle
 import os
-from collections import OrderedDict, defaultdict
+import math
+import shelve
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import MappingProxyType
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut
-from geopy.distance import geodesic
+from geopy.extra.rate_limiter import RateLimiter
+import numpy as np
+import msgpack
 import csv
+import heapq
+
+PICKLE_MAGIC = b"\x80"  # First byte of every pickle (protocol 2+), used to detect legacy data files
+EARTH_RADIUS_KM = 6371.0088  # Mean Earth radius used by the haversine distance
+NUMPY_DISTANCE_THRESHOLD = 64  # Above this many locations the NumPy path beats a plain math loop
+NUMBA_DISTANCE_THRESHOLD = 1024  # Above this many locations use the fused numba kernel (when installed)
+GEOCODE_MISS_TTL = 24 * 60 * 60  # Seconds before a cached "not found" geocoding result is retried
+JOURNAL_COMPACT_THRESHOLD = 256  # Change-log entries allowed before they are folded into a new snapshot
+DAYS_RANGE = np.iinfo(np.int32)  # Values that fit the days column
+
+
+def _hav_km(lat1, lon1, lat2, lon2):
+    """
+    Haversine distance in km between two points, using the math module for single-pair speed.
+    All haversine helpers finish with atan2(sqrt(a), sqrt(1 - a)), which stays accurate from very short hops to near-antipodal legs.
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(max(1 - a, 0.0)))
+
+
+def _numpy_hav_sum(lats, lons):
+    """Total haversine distance in km along consecutive points, vectorized over every pair with NumPy."""
+    lats, lons = np.radians(lats), np.radians(lons)
+    lat1, lat2 = lats[:-1], lats[1:]
+    dlat = lat2 - lat1
+    dlon = lons[1:] - lons[:-1]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return float((2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(np.maximum(1 - a, 0.0)))).sum())
+
+
+_numba_kernel = None  # Compiled on first use; False once we know numba is not installed
+
+
+def _numba_hav_sum(lats, lons):
+    """
+    Total haversine distance in km along consecutive points, fused into a single numba-compiled pass.
+    numba is optional and imported lazily; returns None when it is not available so callers can fall back to NumPy.
+    """
+    global _numba_kernel
+    if _numba_kernel is None:
+        try:
+            from numba import njit, prange
+        except ImportError:
+            _numba_kernel = False
+        else:
+            @njit(cache=True, fastmath=True, parallel=True)
+            def kernel(lats, lons):
+                total = 0.0
+                for i in prange(lats.shape[0] - 1):
+                    lat1, lat2 = math.radians(lats[i]), math.radians(lats[i + 1])
+                    dlat = lat2 - lat1
+                    dlon = math.radians(lons[i + 1] - lons[i])
+                    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+                    total += 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(max(1 - a, 0.0)))
+                return total
+
+            _numba_kernel = kernel
+    if _numba_kernel is False:
+        return None
+    return float(_numba_kernel(lats, lons))
 
 class TravelData:
     """
@@ -13,14 +82,18 @@ class TravelData:
     FUNCTIONS SUMMARY:
     ---------------------------------------------------
     # DATA STORAGE & MANAGEMENT
-    - __init__(self, file_path): Initializes the class, loads stored travel data, and sets up geolocation services.
-    - save_data(self): Saves the current travel data to a Pickle file.
-    - load_data(self): Loads travel data from a Pickle file, or initializes fresh data if not found.
+    - __init__(self, file_path, verbose): Initializes the class, loads stored travel data, and sets up geolocation services.
+    - save_data(self): Saves a full snapshot of the travel data to a MessagePack file (deferred while inside batch()).
+    - batch(self): Context manager that groups several changes into a single save.
+    - compact(self): Folds the change log into a fresh snapshot.
+    - load_data(self): Loads travel data from a MessagePack (or legacy Pickle) file and replays the change log, or initializes fresh data if not found.
     - clear_data(self): Clears all stored travel data, resetting it to an empty dictionary.
+    - close(self): Closes the change log and the on-disk geocoding cache.
     
     # LOCATION MANAGEMENT
-    - get_lat_lon(self, location): Fetches latitude and longitude using OpenStreetMap (geopy) API.
+    - get_lat_lon(self, location): Fetches latitude and longitude using OpenStreetMap (geopy) API, cached on disk.
     - add_location(self, name, country, days, transport, position, after_place): Adds a new location, automatically retrieving its coordinates.
+    - bulk_add_locations(self, entries, max_workers): Adds many locations at once, geocoding them concurrently.
     - remove_location(self, name): Removes a location from the travel plan.
     - move_location(self, name, new_position, after_place): Moves a location to the start, end, or after another location.
     
@@ -32,8 +105,8 @@ class TravelData:
     
     # ITINERARY ANALYSIS
     - total_days(self): Calculates and displays the total number of travel days.
-    - days_per_country(self): Calculates and displays the total days spent in each country.
-    - calculate_total_distance(self): Computes the total travel distance (km) between all locations.
+    - days_per_country(self, top): Calculates and displays the total days spent in each country (optionally only the top N).
+    - calculate_total_distance(self, accurate): Computes the total travel distance (km) between all locations.
     
     # DISPLAY & EXPORT
     - list_locations(self): Lists all stored travel locations in order.
@@ -41,81 +114,422 @@ class TravelData:
     - export_to_csv(self, filename): Exports travel data to a CSV file for easy sharing.
     """
 
-    def __init__(self, file_path):
-        """Initialize the class with an empty ordered dictionary and a file path for storage."""
+    def __init__(self, file_path, verbose=True):
+        """
+        Initialize the class with empty location columns and a file path for storage.
+        Set verbose=False to silence success messages (warnings and errors are always printed).
+        """
         self.file_path = file_path
-        self.data = OrderedDict()  # Maintain order of locations
+        self.verbose = verbose
+        self._batch_depth = 0  # Number of open batch() blocks; saves are deferred while > 0
+        self._dirty = False  # True when a save was deferred by batch()
+        # Small edits are appended to a change log next to the snapshot instead of rewriting the whole file
+        self._journal_path = file_path + ".log"
+        self._journal_entries = 0
+        self._needs_snapshot = False  # True when the on-disk snapshot no longer matches what the log builds on
+        self._log = None
+        # Locations are stored column-wise (structure of arrays), one row per stop in travel order
+        self._rebuild_arrays({})
         self.geolocator = Nominatim(user_agent="travel_planner")  # Geolocation API
+        # Nominatim allows one request per second; space calls out and retry transient failures
+        self._geocode = RateLimiter(self.geolocator.geocode, min_delay_seconds=1.0, max_retries=3,
+                                    error_wait_seconds=5.0, swallow_exceptions=False)
+        self._geo_cache = shelve.open(file_path + ".geocache")  # Persistent geocoding results
+        self._geo_cache_lock = threading.Lock()  # shelve is not thread-safe (see bulk_add_locations)
+        self._geod = None  # pyproj WGS-84 ellipsoid, created on the first accurate distance calculation
         self.load_data()  # Load existing data if available
+        self._log = open(self._journal_path, 'ab')
+
+    @property
+    def data(self):
+        """
+        Read-only {name: (country, lat, lon, days, transport)} view, built from the columns on each access.
+        Edit locations through the methods below, or replace the whole mapping with `travel.data = {...}`.
+        """
+        return MappingProxyType(dict(zip(self._names, zip(self._countries, self._lats.tolist(), self._lons.tolist(),
+                                                          self._days.tolist(), self._transport))))
+
+    @data.setter
+    def data(self, rows):
+        self._rebuild_arrays(rows)
+        self._needs_snapshot = True  # Log entries would replay on top of the old snapshot, so write a new one first
+
+    def _notify(self, message):
+        """Print a success message, unless the instance was created with verbose=False."""
+        if self.verbose:
+            print(message)
+
+    def _rebuild_arrays(self, rows):
+        """Replace every column with the contents of a {name: (country, lat, lon, days, transport)} mapping."""
+        self._names = list(rows)
+        self._index = {name: i for i, name in enumerate(self._names)}  # name -> row, for O(1) lookups
+        details = list(rows.values())
+        self._countries = [d[0] for d in details]
+        self._lats = np.asarray([d[1] for d in details], dtype=np.float64)
+        self._lons = np.asarray([d[2] for d in details], dtype=np.float64)
+        self._days = np.asarray([d[3] for d in details], dtype=np.int32)
+        self._transport = [d[4] for d in details]
+        self._rebuild_country_days()
+
+    def _rebuild_country_days(self):
+        """Recompute the cached {country: [days, stops]} totals from the columns in one vectorized pass."""
+        countries, codes = np.unique(np.asarray(self._countries, dtype=str), return_inverse=True)
+        days = np.bincount(codes, weights=self._days, minlength=len(countries)).astype(np.int64).tolist()
+        stops = np.bincount(codes, minlength=len(countries)).tolist()
+        self._country_days = {country: [d, n] for country, d, n in zip(countries.tolist(), days, stops)}
+
+    def _tally(self, country, days, stops):
+        """Adjust the cached per-country totals; negative values remove days or stops."""
+        totals = self._country_days.setdefault(country, [0, 0])
+        totals[0] += days
+        totals[1] += stops
+        if not totals[1]:
+            del self._country_days[country]
+
+    def _reindex(self, start=0, stop=None):
+        """Refresh the name -> row lookup for rows [start, stop) after they have shifted position."""
+        stop = len(self._names) if stop is None else stop
+        self._index.update(zip(self._names[start:stop], range(start, stop)))
+
+    def _insert_row(self, index, name, country, lat, lon, days, transport):
+        """Insert one location into every column at the given index."""
+        self._names.insert(index, name)
+        self._countries.insert(index, country)
+        self._lats = np.insert(self._lats, index, lat)
+        self._lons = np.insert(self._lons, index, lon)
+        self._days = np.insert(self._days, index, days)
+        self._transport.insert(index, transport)
+        self._reindex(index)
+        self._tally(country, int(self._days[index]), 1)  # Tally what the int32 column actually stored
+
+    def _set_row(self, index, country, lat, lon, days, transport):
+        """Overwrite the details of the location stored at the given index."""
+        self._tally(self._countries[index], -int(self._days[index]), -1)
+        self._countries[index] = country
+        self._lats[index] = lat
+        self._lons[index] = lon
+        self._days[index] = days
+        self._transport[index] = transport
+        self._tally(country, int(self._days[index]), 1)
+
+    def _delete_row(self, index):
+        """Remove one location from every column."""
+        del self._index[self._names[index]]
+        self._tally(self._countries[index], -int(self._days[index]), -1)
+        for column in (self._names, self._countries, self._transport):
+            del column[index]
+        self._lats = np.delete(self._lats, index)
+        self._lons = np.delete(self._lons, index)
+        self._days = np.delete(self._days, index)
+        self._reindex(index)
+
+    def _move_row(self, index, position, after_place):
+        """Move one location to "start", "end" or after another place, shifting only the rows in between."""
+        if position == "start":
+            target = 0
+        elif position == "after" and after_place in self._index and after_place != self._names[index]:
+            target = self._index[after_place]
+            if target < index:
+                target += 1
+        else:
+            target = len(self._names) - 1
+
+        if target == index:
+            return
+        for column in (self._names, self._countries, self._transport):
+            column.insert(target, column.pop(index))
+        # Rotate the affected slice of each array in place instead of reallocating the whole column
+        lo, hi = min(index, target), max(index, target) + 1
+        shift = 1 if target < index else -1
+        for column in (self._lats, self._lons, self._days):
+            column[lo:hi] = np.roll(column[lo:hi], shift)
+        self._reindex(lo, hi)
+
+    def _target_index(self, position, after_place):
+        """Translate a "start" / "end" / "after" position into a row index for a new location."""
+        if position == "start":
+            return 0
+        if position == "after" and after_place in self._index:
+            return self._index[after_place] + 1
+        return len(self._names)
+
+    def _apply(self, entry):
+        """Apply one change-log entry to the columns; used for live edits and when replaying the log."""
+        op, name = entry["op"], entry["name"]
+        if op == "add":
+            details = (entry["country"], entry["lat"], entry["lon"], entry["days"], entry["transport"])
+            if name in self._index:
+                # Re-adding a place replaces its old entry
+                index = self._index[name]
+                self._set_row(index, *details)
+                self._move_row(index, entry["position"], entry["after_place"])
+            else:
+                self._insert_row(self._target_index(entry["position"], entry["after_place"]), name, *details)
+            return
+
+        index = self._index.get(name)
+        if index is None:
+            return
+        if op == "remove":
+            self._delete_row(index)
+        elif op == "move":
+            self._move_row(index, entry["position"], entry["after_place"])
+        elif op == "change_days":
+            old_days = int(self._days[index])
+            self._days[index] = entry["days"]
+            self._tally(self._countries[index], int(self._days[index]) - old_days, 0)
+        elif op == "change_transport":
+            self._transport[index] = entry["transport"]
+        elif op == "change_country":
+            days = int(self._days[index])
+            self._tally(self._countries[index], -days, -1)
+            self._tally(entry["country"], days, 1)
+            self._countries[index] = entry["country"]
+        elif op == "rename":
+            if entry["new_name"] in self._index:
+                return  # Never create two rows with the same name (also guards against odd logs on replay)
+            self._names[index] = entry["new_name"]
+            self._index[entry["new_name"]] = self._index.pop(name)
+
+    def _record(self, *entries):
+        """Apply one or more changes and append them to the change log."""
+        for entry in entries:
+            self._apply(entry)
+        self._journal(*entries)
+
+    def close(self):
+        """Close the change log and the on-disk geocoding cache."""
+        if self._log is not None:
+            self._log.close()
+        self._geo_cache.close()
+
+    def __del__(self):
+        """Make sure the geocoding cache is flushed when the object is garbage collected."""
+        if hasattr(self, "_geo_cache"):
+            self.close()
 
     def save_data(self):
-        """Save the current travel data to a Pickle file."""
+        """Save the current travel data to a MessagePack file, or mark it for saving when inside batch()."""
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._write_data()
+
+    def _write_data(self):
+        """Write a full snapshot to disk unconditionally; the change log is then emptied."""
         try:
+            payload = msgpack.packb(self._columns_payload(), use_bin_type=True)  # Encode fully in memory first
             with open(self.file_path, 'wb') as f:
-                pickle.dump(self.data, f)
-            print("✅ Travel data saved successfully.")
+                f.write(payload)  # then hand it to the OS in a single write
+            if self._log is not None:
+                self._log.truncate(0)
+            self._journal_entries = 0
+            self._needs_snapshot = False
+            self._dirty = False
+            self._notify("✅ Travel data saved successfully.")
         except Exception as e:
             print(f"❌ Error saving data: {e}")
 
+    @contextmanager
+    def batch(self):
+        """
+        Group several changes into one save, e.g.:
+            with travel.batch():
+                travel.change_days("Bali", 14)
+                travel.move_location("Bali", "start")
+        Batches can be nested; the data is written once when the outermost block exits.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self._write_data()
+
+    def _journal(self, *entries):
+        """Append changes to the change log, compacting it into a new snapshot once it grows too long."""
+        if self._batch_depth:
+            self._dirty = True  # The snapshot written when the batch ends covers these changes
+            return
+        if self._needs_snapshot:
+            self._write_data()  # The data was replaced wholesale; a snapshot covers these changes too
+            return
+        try:
+            self._log.write(b"".join(msgpack.packb(entry, use_bin_type=True) for entry in entries))
+            self._log.flush()
+            self._journal_entries += len(entries)
+        except Exception as e:
+            print(f"❌ Error saving data: {e}")
+        if self._journal_entries >= JOURNAL_COMPACT_THRESHOLD:
+            self.compact()
+
+    def compact(self):
+        """Fold the change log into a fresh snapshot so the next load has nothing to replay."""
+        if self._journal_entries:
+            self._write_data()
+
     def load_data(self):
-        """Load travel data from a Pickle file (if it exists)."""
+        """Load travel data from a MessagePack file (if it exists), falling back to Pickle for older files."""
+        self._needs_snapshot = False
         if os.path.exists(self.file_path):
             try:
                 with open(self.file_path, 'rb') as f:
-                    self.data = pickle.load(f)
-                print("✅ Travel data loaded successfully.")
+                    raw = f.read()  # One read for the whole file, then decode from memory
+                if raw[:1] == PICKLE_MAGIC:
+                    self._rebuild_arrays(dict(pickle.loads(raw)))  # Older files hold an OrderedDict
+                    self._needs_snapshot = True  # The next change rewrites the file as a MessagePack snapshot
+                else:
+                    payload = msgpack.unpackb(raw, raw=False)
+                    if isinstance(payload, dict):
+                        self._load_columns_payload(payload)
+                    else:
+                        self._rebuild_arrays({name: tuple(details) for name, details in payload})  # Older row-per-location files
+                        self._needs_snapshot = True  # The next change rewrites the file in the column format
+                self._notify("✅ Travel data loaded successfully.")
             except Exception as e:
                 print(f"❌ Error loading data: {e}")
-                self.data = OrderedDict()
+                self.data = {}
+                return
         else:
-            print("⚠️ No existing data found. Starting fresh.")
+            self._needs_snapshot = True  # The first change creates the data file, so it never depends on the log alone
+            if not os.path.exists(self._journal_path):
+                print("⚠️ No existing data found. Starting fresh.")
+        self._replay_journal()
+
+    def _replay_journal(self):
+        """Re-apply the changes recorded in the change log since the last snapshot."""
+        self._journal_entries = 0
+        if not os.path.exists(self._journal_path):
+            return
+        with open(self._journal_path, 'rb') as f:
+            raw = f.read()
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(raw)
+        replayed = 0  # Offset just past the last entry that was applied
+        try:
+            for entry in unpacker:
+                self._apply(entry)
+                self._journal_entries += 1
+                replayed = unpacker.tell()
+        except Exception as e:
+            print(f"⚠️ Stopped replaying the change log at a damaged entry: {e}")
+        if replayed < len(raw):
+            # Cut off a partly written or damaged tail, so later changes are not appended after it and lost
+            print(f"⚠️ Discarded {len(raw) - replayed} unreadable bytes at the end of the change log.")
+            os.truncate(self._journal_path, replayed)
+
+    def _columns_payload(self):
+        """Build the on-disk representation: text columns as lists, numeric columns as raw little-endian buffers."""
+        return {
+            "names": self._names,
+            "countries": self._countries,
+            "transport": self._transport,
+            "lats": self._lats.astype("<f8").tobytes(),
+            "lons": self._lons.astype("<f8").tobytes(),
+            "days": self._days.astype("<i4").tobytes(),
+        }
+
+    def _load_columns_payload(self, payload):
+        """Restore the columns from the output of _columns_payload."""
+        self._names = list(payload["names"])
+        self._index = {name: i for i, name in enumerate(self._names)}
+        self._countries = list(payload["countries"])
+        self._transport = list(payload["transport"])
+        self._lats = np.frombuffer(payload["lats"], dtype="<f8").astype(np.float64)
+        self._lons = np.frombuffer(payload["lons"], dtype="<f8").astype(np.float64)
+        self._days = np.frombuffer(payload["days"], dtype="<i4").astype(np.int32)
+        self._rebuild_country_days()
 
     def get_lat_lon(self, location):
-        """Fetch latitude and longitude for a given location using OpenStreetMap API."""
+        """
+        Fetch latitude and longitude for a given location using OpenStreetMap API.
+        Results are cached on disk, so repeat lookups never hit the network; misses are retried after GEOCODE_MISS_TTL.
+        """
+        with self._geo_cache_lock:
+            cached = self._geo_cache.get(location)
+        if cached is not None:
+            lat, lon, looked_up_at = cached
+            if lat is not None:
+                return lat, lon
+            if time.time() - looked_up_at < GEOCODE_MISS_TTL:
+                print(f"⚠️ Could not find coordinates for '{location}'.")
+                return None, None
+
         try:
-            geo_info = self.geolocator.geocode(location)
+            geo_info = self._geocode(location)
             if geo_info:
+                with self._geo_cache_lock:
+                    self._geo_cache[location] = (geo_info.latitude, geo_info.longitude, time.time())
                 return geo_info.latitude, geo_info.longitude
             else:
+                with self._geo_cache_lock:
+                    self._geo_cache[location] = (None, None, time.time())
                 print(f"⚠️ Could not find coordinates for '{location}'.")
                 return None, None
         except GeocoderTimedOut:
-            print("⏳ Geolocation request timed out. Try again.")
+            print("⏳ Geolocation request timed out after several retries. Try again later.")
             return None, None
 
+    def _as_days(self, days):
+        """Convert a number of days to the int stored in the days column, or warn and return None if it is not one."""
+        try:
+            value = int(days)
+            whole = value == float(days)  # Reject 2.9 rather than silently storing 2
+        except (TypeError, ValueError, OverflowError):
+            value, whole = None, False
+        if not whole or not DAYS_RANGE.min <= value <= DAYS_RANGE.max:
+            print(f"⚠️ '{days}' is not a valid number of days.")
+            return None
+        return value
+
     def add_location(self, name, country, days, transport="Unknown", position="end", after_place=None):
         """Add a new travel location at a specific position in the list, fetching coordinates automatically."""
+        days = self._as_days(days)
+        if days is None:
+            return
         lat, lon = self.get_lat_lon(f"{name}, {country}")
 
         if lat is None or lon is None:
             print(f"⚠️ Skipping '{name}' as coordinates could not be found.")
             return
 
-        new_entry = (country, lat, lon, days, transport)
-        updated_data = OrderedDict()
+        self._record({"op": "add", "name": name, "country": country, "lat": lat, "lon": lon, "days": days,
+                      "transport": transport, "position": position, "after_place": after_place})
+        self._notify(f"➕ Added {name} ({days} days) with transport: {transport}. Coordinates: ({lat}, {lon})")
 
-        if position == "start":
-            updated_data[name] = new_entry
-            updated_data.update(self.data)
-            self.data = updated_data
-        elif position == "after" and after_place in self.data:
-            for key, value in self.data.items():
-                updated_data[key] = value
-                if key == after_place:
-                    updated_data[name] = new_entry
-            self.data = updated_data
-        else:
-            self.data[name] = new_entry
+    def bulk_add_locations(self, entries, max_workers=4):
+        """
+        Add many locations to the end of the list, geocoding them concurrently and saving once.
+        Each entry is (name, country, days) or (name, country, days, transport). Cached places skip the network.
+        """
+        valid_entries = []
+        for name, country, days, *rest in entries:
+            days = self._as_days(days)  # Bad day counts are reported and skipped before any geocoding
+            if days is not None:
+                valid_entries.append((name, country, days, *rest))
+        entries = valid_entries
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            coordinates = list(pool.map(lambda entry: self.get_lat_lon(f"{entry[0]}, {entry[1]}"), entries))
 
-        print(f"➕ Added {name} ({days} days) with transport: {transport}. Coordinates: ({lat}, {lon})")
-        self.save_data()
+        added = []
+        for (name, country, days, *rest), (lat, lon) in zip(entries, coordinates):
+            transport = rest[0] if rest else "Unknown"
+            if lat is None or lon is None:
+                print(f"⚠️ Skipping '{name}' as coordinates could not be found.")
+                continue
+            added.append({"op": "add", "name": name, "country": country, "lat": lat, "lon": lon, "days": days,
+                          "transport": transport, "position": "end", "after_place": None})
+            self._notify(f"➕ Added {name} ({days} days) with transport: {transport}. Coordinates: ({lat}, {lon})")
+
+        if added:
+            self._record(*added)
 
     def remove_location(self, name):
         """Remove a travel location if it exists."""
-        if name in self.data:
-            del self.data[name]
-            print(f"❌ Removed {name}.")
-            self.save_data()
+        if name in self._index:
+            self._record({"op": "remove", "name": name})
+            self._notify(f"❌ Removed {name}.")
         else:
             print(f"⚠️ {name} not found in data.")
 
@@ -123,44 +537,22 @@ class TravelData:
         """
         Move an existing location to a new position: "start", "end", or after another location.
         """
-        if name not in self.data:
+        if name not in self._index:
             print(f"⚠️ {name} not found in the travel list.")
             return
 
-        # Extract the location details
-        location_details = self.data.pop(name)
-        updated_data = OrderedDict()
-
-        if new_position == "start":
-            # Move to the beginning
-            updated_data[name] = location_details
-            updated_data.update(self.data)
-
-        elif new_position == "after" and after_place in self.data:
-            # Move after a specific place
-            for key, value in self.data.items():
-                updated_data[key] = value
-                if key == after_place:
-                    updated_data[name] = location_details
-
-        else:
-            # Default: Move to the end
-            self.data[name] = location_details
-            updated_data = self.data
-
-        self.data = updated_data
-        print(f"🔄 Moved {name} to position: {new_position}.")
-        self.save_data()
+        self._record({"op": "move", "name": name, "position": new_position, "after_place": after_place})
+        self._notify(f"🔄 Moved {name} to position: {new_position}.")
 
     def clear_data(self):
         """Clear all travel data, resetting to an empty dictionary."""
-        self.data = OrderedDict()
+        self._rebuild_arrays({})
         self.save_data()
-        print("🗑️ All travel data has been cleared.")
+        self._notify("🗑️ All travel data has been cleared.")
 
     def display_data(self):
         """Print the stored travel data in a readable format."""
-        if self.data:
+        if self._names:
             print("\n🔹 Current Travel Data:")
             for place, details in self.data.items():
                 print(f"{place}: {details}")
@@ -169,99 +561,137 @@ class TravelData:
 
     def list_locations(self):
         """List all stored locations in order."""
-        if not self.data:
+        if not self._names:
             print("⚠️ No travel locations stored.")
             return
         print("\n📍 List of Travel Locations:")
-        for i, place in enumerate(self.data.keys(), start=1):
+        for i, place in enumerate(self._names, start=1):
             print(f"{i}. {place}")
 
     def total_days(self):
         """Calculate and display the total number of days across all locations."""
-        total = sum(details[3] for details in self.data.values())
+        total = int(self._days.sum())
         print(f"\n📅 Total Travel Days: {total} days")
         return total
     
-    def days_per_country(self):
-        """Calculate and display the total number of days spent in each country."""
-        country_days = defaultdict(int)
+    def days_per_country(self, top=None):
+        """
+        Calculate and display the total number of days spent in each country.
+        Pass top=N to show only the N countries with the most days. Countries with equal days are listed alphabetically.
+        """
+        # The per-country totals are kept up to date by every change, so there is nothing to rescan here
+        items = ((country, totals[0]) for country, totals in self._country_days.items())
 
-        for place, details in self.data.items():
-            country = details[0]  # Extract country name
-            days = details[3]  # Extract number of days
-            country_days[country] += days  # Sum up days per country
+        def order(item):
+            country, days = item
+            return -days, country  # Most days first; ties by name, independent of how the cache was built
+
+        if top is None:
+            country_days = dict(sorted(items, key=order))
+        else:
+            country_days = dict(heapq.nsmallest(top, items, key=order))  # Partial sort, O(N log top)
 
         print("\n🌍 Days Spent in Each Country:")
-        for country, days in sorted(country_days.items(), key=lambda x: -x[1]):  # Sort by most days first
+        for country, days in country_days.items():
             print(f"  {country}: {days} days")
         
         return country_days
 
     def change_days(self, name, new_days):
         """Change the number of days spent at a specific location."""
-        if name in self.data:
-            country, lat, lon, _ = self.data[name]  # Keep existing data except days
-            self.data[name] = (country, lat, lon, new_days)
-            print(f"🕒 Updated {name}: Now spending {new_days} days.")
-            self.save_data()
-        else:
+        if name not in self._index:
             print(f"⚠️ {name} not found in the travel list.")
+            return
+        new_days = self._as_days(new_days)  # The days column is an int32 array; reject bad input before touching it
+        if new_days is None:
+            return
+
+        if new_days != self._days[self._index[name]]:  # Unchanged values need no log entry or save
+            self._record({"op": "change_days", "name": name, "days": new_days})
+        self._notify(f"🕒 Updated {name}: Now spending {new_days} days.")
             
     def change_transport(self, name, new_transport):
         """Change the transport method for a specific location."""
-        if name in self.data:
-            country, lat, lon, days, _ = self.data[name]  # Keep existing data except transport
-            self.data[name] = (country, lat, lon, days, new_transport)
-            print(f"🚗 Updated transport for {name}: Now using {new_transport}.")
-            self.save_data()
-        else:
+        if name not in self._index:
             print(f"⚠️ {name} not found in the travel list.")
+            return
+
+        if new_transport != self._transport[self._index[name]]:  # Unchanged values need no log entry or save
+            self._record({"op": "change_transport", "name": name, "transport": new_transport})
+        self._notify(f"🚗 Updated transport for {name}: Now using {new_transport}.")
             
     def change_country(self, name, new_country):
         """Change the country of a specific location."""
-        if name in self.data:
-            _, lat, lon, days, transport = self.data[name]  # Keep all other details unchanged
-            self.data[name] = (new_country, lat, lon, days, transport)
-            print(f"🌍 Updated country for {name}: Now in {new_country}.")
-            self.save_data()
+        if name in self._index:
+            self._record({"op": "change_country", "name": name, "country": new_country})
+            self._notify(f"🌍 Updated country for {name}: Now in {new_country}.")
         else:
             print(f"⚠️ {name} not found in the travel list.")
             
     def change_location_name(self, old_name, new_name):
         """Rename a location while keeping all other details the same."""
-        if old_name in self.data:
-            self.data[new_name] = self.data.pop(old_name)  # Rename key while keeping details
-            print(f"✏️ Renamed '{old_name}' to '{new_name}'.")
-            self.save_data()
+        if old_name in self._index and new_name in self._index:
+            if new_name != old_name:
+                print(f"⚠️ '{new_name}' is already in the travel list. Remove it first or pick another name.")
+        elif old_name in self._index:
+            self._record({"op": "rename", "name": old_name, "new_name": new_name})  # Keeps its position
+            self._notify(f"✏️ Renamed '{old_name}' to '{new_name}'.")
         else:
             print(f"⚠️ '{old_name}' not found in the travel list.")
     
-    def calculate_total_distance(self):
-        """Calculates the total travel distance from location to location."""
-        if len(self.data) < 2:
+    def calculate_total_distance(self, accurate=False):
+        """
+        Calculates the total travel distance from location to location using the haversine formula.
+        Pass accurate=True to use the WGS-84 ellipsoid instead (pyproj when installed, otherwise geopy).
+        """
+        if len(self._names) < 2:
             print("⚠️ Not enough locations to calculate distance.")
             return 0
-    
-        locations = list(self.data.keys())
-        total_distance = 0
-    
-        for i in range(len(locations) - 1):
-            loc1 = (self.data[locations[i]][1], self.data[locations[i]][2])
-            loc2 = (self.data[locations[i + 1]][1], self.data[locations[i + 1]][2])
-            total_distance += geodesic(loc1, loc2).km
-    
+
+        if accurate:
+            total_distance = self._geodesic_distance()
+        elif len(self._names) <= NUMPY_DISTANCE_THRESHOLD:
+            # Short itineraries: a scalar math loop avoids NumPy's per-call overhead
+            coords = list(zip(self._lats.tolist(), self._lons.tolist()))
+            total_distance = sum(_hav_km(*start, *end) for start, end in zip(coords, coords[1:]))
+        else:
+            total_distance = None
+            if len(self._names) > NUMBA_DISTANCE_THRESHOLD:
+                # Very long itineraries: the fused numba kernel avoids NumPy's temporary arrays
+                total_distance = _numba_hav_sum(self._lats, self._lons)
+            if total_distance is None:
+                total_distance = _numpy_hav_sum(self._lats, self._lons)
+
         print(f"🌍 Total Travel Distance: {round(total_distance, 2)} km")
         return total_distance
     
 
+    def _geodesic_distance(self):
+        """Total WGS-84 distance in km, solved for every leg in one vectorized pyproj call (geopy as a fallback)."""
+        if self._geod is None:
+            try:
+                from pyproj import Geod
+            except ImportError:
+                self._geod = False
+            else:
+                self._geod = Geod(ellps="WGS84")
+
+        if self._geod is False:
+            from geopy.distance import geodesic  # Slower per-pair fallback when pyproj is not installed
+            coords = list(zip(self._lats.tolist(), self._lons.tolist()))
+            return sum(geodesic(start, end).km for start, end in zip(coords, coords[1:]))
+
+        _, _, dist_m = self._geod.inv(self._lons[:-1], self._lats[:-1], self._lons[1:], self._lats[1:])
+        return float(np.sum(dist_m)) / 1000.0
+
     def export_to_csv(self, filename="travel_data.csv"):
         """Exports travel data to a CSV file."""
         with open(filename, mode="w", newline="") as file:
             writer = csv.writer(file)
             writer.writerow(["Location", "Country", "Latitude", "Longitude", "Days", "Transport"])
+            # Stream the rows straight from the columns in a single writerows call
+            writer.writerows(zip(self._names, self._countries, self._lats.tolist(), self._lons.tolist(),
+                                 self._days.tolist(), self._transport))
     
-            for place, details in self.data.items():
-                writer.writerow([place, *details])
-    
-        print(f"📂 Travel data exported to {filename}.")
+        self._notify(f"📂 Travel data exported to {filename}.")
 